@@ -1,7 +1,14 @@
 """
 User action tracking system for detailed analytics
 """
+import atexit
 import json
+import mmap
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -9,214 +16,396 @@ from typing import Optional, Dict, Any
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from action_types import ActionType, decode_action
+from json_utils import dumps, iter_json_records, loads, terminate_last_line
 
-# Action types constants
-class ActionType:
-    START = "start"
-    GOT_VIDEO = "got_video"
-    ASKED_ABOUT_WATCHED_VIDEO = "asked_about_watched_video"
-    ANSWERED_ABOUT_WATCHED_VIDEO = "answered_about_watched_video"
-    ASKED_TO_SHOOT_VIDEO = "asked_to_shoot_video"
-    ANSWERED_TO_SHOOT_VIDEO = "answered_to_shoot_video"
-    GOT_INSTRUCTIONS = "got_instructions"
-    SENT_VIDEO = "sent_video"
-    ASKED_TO_CONFIRM_SENDING = "asked_to_confirm_sending"
-    ANSWERED_CONFIRM_SENDING = "answered_confirm_sending"
-    ASKED_TO_CONFIRM_PRIVACY = "asked_to_confirm_privacy"
-    ANSWERED_CONFIRM_PRIVACY = "answered_confirm_privacy"
-    ASKED_WHY_HESITANT_OR_REJECT = "asked_why_hesitant_or_reject"
-    ANSWERED_WHY_HESITANT_OR_REJECT = "answered_why_hesitant_or_reject"
-    START_TRIGGERED_AGAIN = "start_triggered_again"
-
-
-def _get_user_id_from_update(update: Update) -> Optional[int]:
-    """Extract user ID from update"""
-    if update.effective_user:
-        return update.effective_user.id
-    return None
-
-
-def _log_action(action_type: str, user_id: int, additional_data: Optional[Dict[str, Any]] = None, 
-                filename: str = "user_actions.json") -> None:
+
+ACTIONS_DIR = "user_actions"
+LEGACY_ACTIONS_FILE = "user_actions.json"
+
+
+_ts_cache = (-1, "")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time in ISO format, reusing the formatted date/time prefix within the same second"""
+    global _ts_cache
+    sec, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    last_sec, prefix = _ts_cache
+    if sec != last_sec:
+        prefix = datetime.fromtimestamp(sec, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{micros:06d}+00:00"
+
+
+# Serialized records of actions without extras, indexed by ActionType; only the timestamp is filled in
+_FAST_TEMPLATES = tuple(b'{"t":%d,"timestamp":"%%b"}' % action_type for action_type in ActionType)
+
+
+def _log_action(action_type: ActionType, user_id: int, additional_data: Optional[Dict[str, Any]] = None, 
+                directory: str = ACTIONS_DIR) -> None:
     """Log a user action with timestamp and additional data"""
+    if not additional_data:
+        # Most actions carry no extras: fill a pre-rendered record instead of building and serializing a dict
+        _journal.enqueue(_FAST_TEMPLATES[action_type] % _utc_timestamp().encode("ascii"), user_id, directory)
+        return
+    
+    # user_id is implied by the per-user log file, so it is not repeated in every record
     action_entry = {
-        "action_type": action_type,
-        "user_id": user_id,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "t": int(action_type),
+        "timestamp": _utc_timestamp(),
     }
+    action_entry.update(additional_data)
     
-    if additional_data:
-        action_entry.update(additional_data)
-    
-    _append_action_to_file(action_entry, filename)
+    _journal.enqueue(action_entry, user_id, directory)
+
+
+def _user_actions_path(user_id: int, directory: str = ACTIONS_DIR) -> str:
+    """Get path of the per-user JSONL action log"""
+    return os.path.join(directory, f"{user_id}.jsonl")
+
+
+_MIGRATED_DIRS = set()
+
 
+def _migrate_legacy_actions_file(directory: str = ACTIONS_DIR, legacy_filename: str = LEGACY_ACTIONS_FILE) -> None:
+    """Split a legacy single-file action log (JSON list or JSONL) into per-user files (one-shot per directory)"""
+    if directory in _MIGRATED_DIRS:
+        return
+    _MIGRATED_DIRS.add(directory)
 
-def _append_action_to_file(action_entry: dict, filename: str = "user_actions.json") -> None:
-    """Append action entry to JSON file"""
-    out_path = Path(filename)
+    legacy_path = Path(legacy_filename)
+    if not legacy_path.is_file():
+        return
     try:
-        if out_path.exists():
-            try:
-                existing = json.loads(out_path.read_text(encoding="utf-8"))
-                if not isinstance(existing, list):
-                    existing = []
-            except Exception:
-                existing = []
-        else:
-            existing = []
-
-        existing.append(action_entry)
-        out_path.write_text(json.dumps(existing, ensure_ascii=False, indent=2), encoding="utf-8")
+        existing = list(iter_json_records(legacy_filename))
+    except Exception:
+        return
+
+    by_user: Dict[int, list] = {}
+    for entry in existing:
+        if entry.get("user_id"):
+            by_user.setdefault(entry["user_id"], []).append(entry)
+
+    os.makedirs(directory, exist_ok=True)
+    for user_id, entries in by_user.items():
+        with open(_user_actions_path(user_id, directory), "ab") as f:
+            f.write(b"".join(dumps(entry) + b"\n" for entry in entries))
+    legacy_path.replace(legacy_path.with_name(legacy_path.name + ".migrated"))
+
+
+# Per-user logs mean one descriptor per active user, so keep only the most recently used ones open
+_MAX_OPEN_FDS = 128
+_FDS: "OrderedDict[tuple, int]" = OrderedDict()
+
+
+def _get_fd(user_id: int, directory: str = ACTIONS_DIR) -> int:
+    """Get a cached append-mode file descriptor of a user's log, opening it on first use"""
+    key = (directory, user_id)
+    fd = _FDS.get(key)
+    if fd is not None:
+        _FDS.move_to_end(key)
+        return fd
+
+    # Path is only built on a cache miss; O_CREAT makes an existence check unnecessary
+    _migrate_legacy_actions_file(directory)
+    filename = _user_actions_path(user_id, directory)
+    flags = os.O_RDWR | os.O_APPEND | os.O_CREAT
+    try:
+        fd = os.open(filename, flags, 0o644)
+    except FileNotFoundError:
+        os.makedirs(directory, exist_ok=True)
+        fd = os.open(filename, flags, 0o644)
+    terminate_last_line(fd)
+
+    _FDS[key] = fd
+    if len(_FDS) > _MAX_OPEN_FDS:
+        _, old_fd = _FDS.popitem(last=False)
+        os.close(old_fd)
+    return fd
+
+
+def _close_fds() -> None:
+    """Close all cached file descriptors"""
+    while _FDS:
+        _, fd = _FDS.popitem()
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+atexit.register(_close_fds)
+
+
+def _append_actions_to_file(action_entries: list, user_id: int, directory: str = ACTIONS_DIR) -> None:
+    """Append action entries (dicts or pre-serialized records) to the user's JSONL file with a single write"""
+    try:
+        buf = b"\n".join(entry if isinstance(entry, bytes) else dumps(entry) for entry in action_entries) + b"\n"
+        fd = _get_fd(user_id, directory)
+        while buf:
+            buf = buf[os.write(fd, buf):]
     except Exception:
         # Fail silently to avoid breaking bot flow
         pass
 
 
+class ActionJournal:
+    """Bounded in-memory ring of action entries drained to disk by a background thread"""
+
+    def __init__(self, maxlen: int = 10000, batch_size: int = 500) -> None:
+        self.maxlen = maxlen
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._ring = deque()
+        self._wakeup = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, action_entry, user_id: int, directory: str = ACTIONS_DIR) -> None:
+        """Queue an entry for writing without blocking; drops it if the ring is full"""
+        if len(self._ring) >= self.maxlen:
+            self.dropped += 1
+            return
+        self._ring.append((action_entry, user_id, directory))
+        if self._thread is None:
+            self._start()
+        self._wakeup.set()
+
+    def flush(self) -> None:
+        """Write all queued entries to disk"""
+        with self._drain_lock:
+            while self._ring:
+                batches: Dict[tuple, list] = {}
+                for _ in range(min(self.batch_size, len(self._ring))):
+                    action_entry, user_id, directory = self._ring.popleft()
+                    batches.setdefault((user_id, directory), []).append(action_entry)
+                for (user_id, directory), action_entries in batches.items():
+                    _append_actions_to_file(action_entries, user_id, directory)
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="action-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+        self._install_sigterm_handler()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self.flush()
+
+    def _install_sigterm_handler(self) -> None:
+        """Flush queued entries before the process is terminated"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGTERM)
+        if previous == signal.SIG_IGN:
+            return
+
+        def _on_sigterm(signum, frame):
+            self.flush()
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                raise SystemExit(128 + signum)
+
+        signal.signal(signal.SIGTERM, _on_sigterm)
+
+
+_journal = ActionJournal()
+
+
+def _log_update_action(update: Update, action_type: ActionType, additional_data: Optional[Dict[str, Any]] = None) -> None:
+    """Log an action for the user of the update, if the update has one"""
+    user = update.effective_user
+    if user:
+        _log_action(action_type, user.id, additional_data)
+
+
 # Action logging functions
 def log_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when user starts the bot"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.START, user_id)
+    _log_update_action(update, ActionType.START)
 
 
 def log_got_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when user receives manager video"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.GOT_VIDEO, user_id)
+    _log_update_action(update, ActionType.GOT_VIDEO)
 
 
 def log_asked_about_watched_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when bot asks about watched video"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ASKED_ABOUT_WATCHED_VIDEO, user_id)
+    _log_update_action(update, ActionType.ASKED_ABOUT_WATCHED_VIDEO)
 
 
 def log_answered_about_watched_video(update: Update, context: ContextTypes.DEFAULT_TYPE, answer: str) -> None:
     """Log user's answer about watched video"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ANSWERED_ABOUT_WATCHED_VIDEO, user_id, {"answer": answer})
+    _log_update_action(update, ActionType.ANSWERED_ABOUT_WATCHED_VIDEO, {"answer": answer})
 
 
 def log_asked_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when bot asks if user wants to shoot video"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ASKED_TO_SHOOT_VIDEO, user_id)
+    _log_update_action(update, ActionType.ASKED_TO_SHOOT_VIDEO)
 
 
 def log_answered_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE, answer: str) -> None:
     """Log user's answer about shooting video"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ANSWERED_TO_SHOOT_VIDEO, user_id, {"answer": answer})
+    _log_update_action(update, ActionType.ANSWERED_TO_SHOOT_VIDEO, {"answer": answer})
 
 
 def log_got_instructions(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when user receives video shooting instructions"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.GOT_INSTRUCTIONS, user_id)
+    _log_update_action(update, ActionType.GOT_INSTRUCTIONS)
 
 
 def log_sent_video(update: Update, context: ContextTypes.DEFAULT_TYPE, video_info: Optional[Dict[str, Any]] = None) -> None:
     """Log when user sends a video"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        additional_data = video_info or {}
-        _log_action(ActionType.SENT_VIDEO, user_id, additional_data)
+    _log_update_action(update, ActionType.SENT_VIDEO, video_info)
 
 
 def log_asked_to_confirm_sending(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when bot asks to confirm video sending"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ASKED_TO_CONFIRM_SENDING, user_id)
+    _log_update_action(update, ActionType.ASKED_TO_CONFIRM_SENDING)
 
 
 def log_answered_confirm_sending(update: Update, context: ContextTypes.DEFAULT_TYPE, answer: str) -> None:
     """Log user's answer about confirming video sending"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ANSWERED_CONFIRM_SENDING, user_id, {"answer": answer})
+    _log_update_action(update, ActionType.ANSWERED_CONFIRM_SENDING, {"answer": answer})
 
 
 def log_asked_to_confirm_privacy(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when bot asks to confirm privacy policy"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ASKED_TO_CONFIRM_PRIVACY, user_id)
+    _log_update_action(update, ActionType.ASKED_TO_CONFIRM_PRIVACY)
 
 
 def log_answered_confirm_privacy(update: Update, context: ContextTypes.DEFAULT_TYPE, answer: str) -> None:
     """Log user's answer about confirming privacy policy"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ANSWERED_CONFIRM_PRIVACY, user_id, {"answer": answer})
+    _log_update_action(update, ActionType.ANSWERED_CONFIRM_PRIVACY, {"answer": answer})
 
 
 def log_asked_why_hesitant_or_reject(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when bot asks why user is hesitant or rejects"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ASKED_WHY_HESITANT_OR_REJECT, user_id)
+    _log_update_action(update, ActionType.ASKED_WHY_HESITANT_OR_REJECT)
 
 
 def log_answered_why_hesitant_or_reject(update: Update, context: ContextTypes.DEFAULT_TYPE, reason: str) -> None:
     """Log user's reason for being hesitant or rejecting"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.ANSWERED_WHY_HESITANT_OR_REJECT, user_id, {"reason": reason})
+    _log_update_action(update, ActionType.ANSWERED_WHY_HESITANT_OR_REJECT, {"reason": reason})
 
 
 def log_start_triggered_again(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log when user triggers start command again"""
-    user_id = _get_user_id_from_update(update)
-    if user_id:
-        _log_action(ActionType.START_TRIGGERED_AGAIN, user_id)
+    _log_update_action(update, ActionType.START_TRIGGERED_AGAIN)
 
 
-def get_user_actions(user_id: int, filename: str = "user_actions.json") -> list:
-    """Get all actions for a specific user"""
-    out_path = Path(filename)
-    if not out_path.exists():
+def _iter_action_lines(filename: str):
+    """Yield raw JSONL lines from a memory-mapped actions file"""
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b"")
+
+
+def _parse_action_lines(lines, user_id: Optional[int] = None) -> list:
+    """Decode JSONL lines into actions, skipping blank or corrupted ones"""
+    actions = []
+    for line in lines:
+        try:
+            actions.append(decode_action(loads(line), user_id))
+        except Exception:
+            # A torn write only damages its own line, so skip it and keep the rest
+            continue
+    return actions
+
+
+def _read_actions_file(user_id: int, directory: str = ACTIONS_DIR) -> list:
+    """Read all actions from a per-user JSONL file"""
+    try:
+        return _parse_action_lines(_iter_action_lines(_user_actions_path(user_id, directory)), user_id)
+    except OSError:
         return []
-    
+
+
+def get_user_ids(directory: str = ACTIONS_DIR) -> list:
+    """Get IDs of all users that have logged actions"""
+    _journal.flush()
+    try:
+        _migrate_legacy_actions_file(directory)
+        names = os.listdir(directory)
+    except Exception:
+        return []
+    return [int(name[:-6]) for name in names if name.endswith(".jsonl") and name[:-6].isdigit()]
+
+
+def iter_user_actions(directory: str = ACTIONS_DIR):
+    """Iterate over (user_id, actions) pairs, reading one user's file at a time"""
+    for user_id in get_user_ids(directory):
+        yield user_id, _read_actions_file(user_id, directory)
+
+
+def iter_actions(directory: str = ACTIONS_DIR):
+    """Iterate over actions of all users, reading one user's file at a time"""
+    for _, actions in iter_user_actions(directory):
+        yield from actions
+
+
+def load_actions(directory: str = ACTIONS_DIR) -> list:
+    """Load actions of all users"""
+    return list(iter_actions(directory))
+
+
+def get_user_actions(user_id: int, directory: str = ACTIONS_DIR) -> list:
+    """Get all actions for a specific user"""
+    _journal.flush()
     try:
-        actions = json.loads(out_path.read_text(encoding="utf-8"))
-        if not isinstance(actions, list):
-            return []
-        
-        return [action for action in actions if action.get("user_id") == user_id]
+        _migrate_legacy_actions_file(directory)
     except Exception:
         return []
+    return _read_actions_file(user_id, directory)
 
 
-def get_user_action_summary(user_id: int, filename: str = "user_actions.json") -> Dict[str, Any]:
+def get_user_action_summary(user_id: int, directory: str = ACTIONS_DIR) -> Dict[str, Any]:
     """Get a summary of user actions"""
-    actions = get_user_actions(user_id, filename)
-    
+    return summarize_user_actions(user_id, get_user_actions(user_id, directory))
+
+
+def summarize_user_actions(user_id: int, actions: list) -> Dict[str, Any]:
+    """Build a summary from already loaded actions of a user"""
     if not actions:
         return {"user_id": user_id, "total_actions": 0, "actions": []}
     
-    # Count actions by type
+    # Count actions by type and track first/last timestamps in one pass
     action_counts = {}
+    first_action = None
+    last_action = None
     for action in actions:
-        action_type = action.get("action_type", "unknown")
+        action_type = action["action_type"]
         action_counts[action_type] = action_counts.get(action_type, 0) + 1
-    
-    # Get first and last action timestamps
-    timestamps = [action.get("timestamp") for action in actions if action.get("timestamp")]
-    timestamps.sort()
+        timestamp = action.get("timestamp")
+        if timestamp:
+            if first_action is None or timestamp < first_action:
+                first_action = timestamp
+            if last_action is None or timestamp > last_action:
+                last_action = timestamp
     
     return {
         "user_id": user_id,
         "total_actions": len(actions),
-        "first_action": timestamps[0] if timestamps else None,
-        "last_action": timestamps[-1] if timestamps else None,
+        "first_action": first_action,
+        "last_action": last_action,
         "action_counts": action_counts,
         "actions": actions
     }
+
+
+def dump_pretty(directory: str = ACTIONS_DIR, output_file: str = "user_actions_pretty.json") -> None:
+    """Write an indented, human-readable copy of all logged actions"""
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(load_actions(directory), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    dump_pretty()
+    print("Pretty-printed actions written to user_actions_pretty.json")
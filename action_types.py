@@ -0,0 +1,41 @@
+"""
+Action type codes of the user action log and decoding of on-disk records (no Telegram dependency)
+"""
+from enum import IntEnum
+from typing import Optional
+
+
+# Action types constants (stored on disk as their integer value)
+class ActionType(IntEnum):
+    START = 0
+    GOT_VIDEO = 1
+    ASKED_ABOUT_WATCHED_VIDEO = 2
+    ANSWERED_ABOUT_WATCHED_VIDEO = 3
+    ASKED_TO_SHOOT_VIDEO = 4
+    ANSWERED_TO_SHOOT_VIDEO = 5
+    GOT_INSTRUCTIONS = 6
+    SENT_VIDEO = 7
+    ASKED_TO_CONFIRM_SENDING = 8
+    ANSWERED_CONFIRM_SENDING = 9
+    ASKED_TO_CONFIRM_PRIVACY = 10
+    ANSWERED_CONFIRM_PRIVACY = 11
+    ASKED_WHY_HESITANT_OR_REJECT = 12
+    ANSWERED_WHY_HESITANT_OR_REJECT = 13
+    START_TRIGGERED_AGAIN = 14
+
+
+# Readable action type names indexed by ActionType value, e.g. "got_video"
+_ACTION_NAMES = tuple(action_type.name.lower() for action_type in ActionType)
+
+
+def decode_action(record: dict, user_id: Optional[int] = None) -> dict:
+    """Restore an on-disk record: readable action type name and the user_id implied by its per-user file.
+    Decoded records always have an "action_type" key, so readers can index it directly."""
+    if user_id is not None:
+        record.setdefault("user_id", user_id)
+    action_type = record.pop("t", None)
+    if action_type is not None:
+        record["action_type"] = _ACTION_NAMES[action_type] if 0 <= action_type < len(_ACTION_NAMES) else "unknown"
+    else:
+        record.setdefault("action_type", "unknown")
+    return record
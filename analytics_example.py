@@ -1,39 +1,117 @@
 """
 Example analytics script to demonstrate how to use the action tracking data
 """
-from action_tracker import get_user_actions, get_user_action_summary
-import json
+from collections import Counter
+from action_tracker import ACTIONS_DIR, iter_user_actions, summarize_user_actions
 from pathlib import Path
 
 
-def analyze_user_engagement():
+# The expected funnel
+FUNNEL_STEPS = [
+    "start",
+    "got_video", 
+    "answered_about_watched_video",
+    "answered_to_shoot_video",
+    "got_instructions",
+    "sent_video",
+    "answered_confirm_sending"
+]
+
+
+def collect_action_stats():
+    """Group actions by user, count action types and funnel reach in a single pass over the log"""
+    user_actions = {}
+    action_counts = Counter()
+    reached = {step: set() for step in FUNNEL_STEPS}
+    
+    # Aggregate one user's batch at a time so counting and set intersection run in C
+    for user_id, actions in iter_user_actions():
+        if not actions:
+            continue
+        user_actions[user_id] = actions
+        action_types = [action["action_type"] for action in actions]
+        action_counts.update(action_types)
+        for step in reached.keys() & set(action_types):
+            reached[step].add(user_id)
+    
+    return user_actions, action_counts, reached
+
+
+def print_user_journey(user_id, actions):
+    """Print summary, completion status and milestones of one user from their loaded actions"""
+    summary = summarize_user_actions(user_id, actions)
+    print(f"\nUser {user_id}:")
+    print(f"  Total actions: {summary['total_actions']}")
+    print(f"  First action: {summary['first_action']}")
+    print(f"  Last action: {summary['last_action']}")
+    
+    # Collect action types and answers in a single pass over the user's actions
+    action_types = set()
+    shoot_answer = None
+    confirm_answer = None
+    confirmed_sending = False
+    for action in actions:
+        action_type = action['action_type']
+        if action_type == 'answered_to_shoot_video':
+            if action_type not in action_types:
+                shoot_answer = action.get('answer')
+        elif action_type == 'answered_confirm_sending':
+            answer = action.get('answer')
+            if action_type not in action_types:
+                confirm_answer = answer
+            if answer == 'confirm_yes':
+                confirmed_sending = True
+        action_types.add(action_type)
+    
+    # Check completion status
+    completion_status = "❌ Incomplete"
+    if "sent_video" in action_types and confirmed_sending:
+        completion_status = "✅ Completed"
+    
+    print(f"  Status: {completion_status}")
+    
+    # Show key milestones
+    milestones = []
+    if "start" in action_types:
+        milestones.append("🚀 Started")
+    if "got_video" in action_types:
+        milestones.append("📹 Got video")
+    if "answered_about_watched_video" in action_types:
+        milestones.append("👀 Watched video")
+    if "answered_to_shoot_video" in action_types:
+        if shoot_answer == "yes":
+            milestones.append("✅ Wants to shoot")
+        elif shoot_answer in ["maybe", "no"]:
+            milestones.append("🤔 Hesitant/Rejected")
+    if "got_instructions" in action_types:
+        milestones.append("📋 Got instructions")
+    if "sent_video" in action_types:
+        milestones.append("📤 Sent video")
+    if "answered_confirm_sending" in action_types:
+        if confirm_answer == "confirm_yes":
+            milestones.append("✅ Confirmed sending")
+        else:
+            milestones.append("❌ Rejected sending")
+    
+    print(f"  Journey: {' → '.join(milestones)}")
+
+
+def analyze_user_engagement(stats=None):
     """Analyze user engagement patterns"""
-    actions_file = Path("user_actions.json")
+    # Load all actions (this also migrates a legacy user_actions.json into per-user files)
+    user_actions, action_counts, _ = stats or collect_action_stats()
     
-    if not actions_file.exists():
+    if not Path(ACTIONS_DIR).exists():
         print("No action data found. Run the bot first to collect data.")
         return
     
-    # Load all actions
-    with open(actions_file, 'r', encoding='utf-8') as f:
-        all_actions = json.load(f)
-    
-    if not all_actions:
+    if not action_counts:
         print("No actions recorded yet.")
         return
     
-    # Get unique users
-    user_ids = set(action.get("user_id") for action in all_actions if action.get("user_id"))
-    
-    print(f"📊 Analytics Report - {len(user_ids)} unique users")
+    print(f"📊 Analytics Report - {len(user_actions)} unique users")
     print("=" * 50)
     
-    # Overall statistics
-    action_counts = {}
-    for action in all_actions:
-        action_type = action.get("action_type", "unknown")
-        action_counts[action_type] = action_counts.get(action_type, 0) + 1
-    
     print("\n📈 Action Frequency:")
     for action_type, count in sorted(action_counts.items(), key=lambda x: x[1], reverse=True):
         print(f"  {action_type}: {count}")
@@ -42,96 +120,24 @@ def analyze_user_engagement():
     print(f"\n👥 User Journey Analysis:")
     print("-" * 30)
     
-    for user_id in sorted(user_ids):
-        summary = get_user_action_summary(user_id)
-        print(f"\nUser {user_id}:")
-        print(f"  Total actions: {summary['total_actions']}")
-        print(f"  First action: {summary['first_action']}")
-        print(f"  Last action: {summary['last_action']}")
-        
-        # Check completion status
-        actions = summary['actions']
-        action_types = [action.get('action_type') for action in actions]
-        
-        completion_status = "❌ Incomplete"
-        if "sent_video" in action_types and "answered_confirm_sending" in action_types:
-            if any(action.get('action_type') == 'answered_confirm_sending' and 
-                   action.get('answer') == 'confirm_yes' for action in actions):
-                completion_status = "✅ Completed"
-        
-        print(f"  Status: {completion_status}")
-        
-        # Show key milestones
-        milestones = []
-        if "start" in action_types:
-            milestones.append("🚀 Started")
-        if "got_video" in action_types:
-            milestones.append("📹 Got video")
-        if "answered_about_watched_video" in action_types:
-            milestones.append("👀 Watched video")
-        if "answered_to_shoot_video" in action_types:
-            shoot_answer = next((action.get('answer') for action in actions 
-                               if action.get('action_type') == 'answered_to_shoot_video'), None)
-            if shoot_answer == "yes":
-                milestones.append("✅ Wants to shoot")
-            elif shoot_answer in ["maybe", "no"]:
-                milestones.append("🤔 Hesitant/Rejected")
-        if "got_instructions" in action_types:
-            milestones.append("📋 Got instructions")
-        if "sent_video" in action_types:
-            milestones.append("📤 Sent video")
-        if "answered_confirm_sending" in action_types:
-            confirm_answer = next((action.get('answer') for action in actions 
-                                 if action.get('action_type') == 'answered_confirm_sending'), None)
-            if confirm_answer == "confirm_yes":
-                milestones.append("✅ Confirmed sending")
-            else:
-                milestones.append("❌ Rejected sending")
-        
-        print(f"  Journey: {' → '.join(milestones)}")
+    for user_id, actions in sorted(user_actions.items()):
+        print_user_journey(user_id, actions)
 
 
-def analyze_drop_off_points():
+def analyze_drop_off_points(stats=None):
     """Analyze where users drop off in the funnel"""
-    actions_file = Path("user_actions.json")
+    user_actions, _, reached = stats or collect_action_stats()
     
-    if not actions_file.exists():
+    if not Path(ACTIONS_DIR).exists():
         print("No action data found.")
         return
     
-    with open(actions_file, 'r', encoding='utf-8') as f:
-        all_actions = json.load(f)
-    
-    # Group actions by user
-    user_actions = {}
-    for action in all_actions:
-        user_id = action.get("user_id")
-        if user_id:
-            if user_id not in user_actions:
-                user_actions[user_id] = []
-            user_actions[user_id].append(action)
-    
-    # Define the expected funnel
-    funnel_steps = [
-        "start",
-        "got_video", 
-        "answered_about_watched_video",
-        "answered_to_shoot_video",
-        "got_instructions",
-        "sent_video",
-        "answered_confirm_sending"
-    ]
-    
     print("\n📉 Funnel Analysis:")
     print("-" * 20)
     
     step_counts = {}
-    for step in funnel_steps:
-        count = 0
-        for user_id, actions in user_actions.items():
-            action_types = [action.get('action_type') for action in actions]
-            if step in action_types:
-                count += 1
+    for step in FUNNEL_STEPS:
+        count = len(reached[step])
         step_counts[step] = count
         print(f"{step}: {count} users")
     
@@ -142,11 +148,11 @@ def analyze_drop_off_points():
     total_users = len(user_actions)
     print(f"Total users: {total_users}")
     
-    for i, step in enumerate(funnel_steps):
+    for i, step in enumerate(FUNNEL_STEPS):
         if i == 0:
             continue
         
-        prev_step = funnel_steps[i-1]
+        prev_step = FUNNEL_STEPS[i-1]
         current_count = step_counts[step]
         prev_count = step_counts[prev_step]
         
@@ -159,10 +165,11 @@ if __name__ == "__main__":
     print("🤖 Telegram Bot Analytics")
     print("=" * 30)
     
-    analyze_user_engagement()
-    analyze_drop_off_points()
+    stats = collect_action_stats()
+    analyze_user_engagement(stats)
+    analyze_drop_off_points(stats)
     
     print("\n💡 Tips:")
     print("- Run this script after users interact with your bot")
-    print("- Check user_actions.json for raw data")
+    print(f"- Check the {ACTIONS_DIR}/ directory for raw data (one JSONL file per user)")
     print("- Use this data to optimize your bot's user experience")
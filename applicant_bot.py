@@ -1,8 +1,13 @@
 import asyncio
+import logging
+import os
+from functools import partial
+from io import BytesIO
 from pathlib import Path
 from typing import Optional
 
-from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, InputFile, Update
+from telegram.error import BadRequest
 from telegram.ext import Application, CallbackQueryHandler, CommandHandler, ContextTypes, MessageHandler, filters
 from video_handler import handle_video_confirmation, handle_video
 from user_data_handler import collect_user_silently
@@ -15,6 +20,7 @@ from action_tracker import (
     log_start_triggered_again
 )
 
+logger = logging.getLogger(__name__)
 
 INTRO_TEXT = """👋 Привет!
 Уже загружаю приветствие от нанимающего менеджера.\nЭто займет несколько секунд."""
@@ -37,6 +43,60 @@ INSTRUCTIONS_TO_SHOOT_VIDEO_TEXT = """📹Запиши видео прямо з
 
 PRIVACY_TEXT = "Нажимая кнопку, вы даёте согласие на обработку персональных данных. Ссылка на политику конфиденциальности: https://hrvibe.ru/page80523236.html"
 
+MANAGER_FILE_ID_FILE = "manager_file_id.txt"
+VIDEO_EXTS = frozenset({".mp4", ".mov", ".avi", ".mkv", ".webm"})
+
+# Set SLOW_MODE to pause briefly before the first question instead of firing messages back to back
+SLOW_MODE = os.getenv("SLOW_MODE", "").lower() in ("1", "true", "yes")
+
+# Callback data -> value logged for the answer
+_ANSWER_MAP = {
+    "video_yes": "yes",
+    "video_no": "no",
+    "video_not_seen": "not_seen",
+}
+_REASON_MAP = {
+    "reason_no_company": "no_company",
+    "reason_no_awkward": "awkward",
+    "reason_no_dont_know": "dont_know",
+    "reason_no_privacy": "privacy",
+    "reason_no_other": "other",
+}
+# Acknowledgement sent for each answer about the manager video
+_ACK_TEXTS = {
+    "video_yes": "Отлично!⚡",
+    "video_no": "Понятно. Спасибо за честность!😊",
+    "video_not_seen": "Извиняюсь за технические проблемы. Пошел ремонтироваться 😊",
+}
+
+# Inline keyboards are static, so build them once at import
+WATCHED_VIDEO_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton(text="Да", callback_data="video_yes")],
+    [InlineKeyboardButton(text="Нет", callback_data="video_no")],
+    [InlineKeyboardButton(text="Не вижу видео", callback_data="video_not_seen")],
+])
+SHOOT_VIDEO_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton(text="Кончено, Да", callback_data="yes")],
+    [InlineKeyboardButton(text="Возможно, надо подумать", callback_data="maybe")],
+    [InlineKeyboardButton(text="Нет, не хочу", callback_data="no")],
+])
+CONFIRM_SEND_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton(text="Да", callback_data="confirm_yes_privacy")],
+    [InlineKeyboardButton(text="Нет", callback_data="confirm_no")],
+])
+PRIVACY_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton(text="Отправить", callback_data="privacy_confirm_yes")],
+    [InlineKeyboardButton(text="Не отправлять", callback_data="privacy_confirm_no")],
+])
+HESITANT_KB = InlineKeyboardMarkup([
+    [InlineKeyboardButton(text="Не хочу устраиваться в эту компанию", callback_data="reason_no_company")],
+    [InlineKeyboardButton(text="Неловко записывать видео", callback_data="reason_no_awkward")],
+    [InlineKeyboardButton(text="Не знаю как или что записать", callback_data="reason_no_dont_know")],
+    [InlineKeyboardButton(text="Переживаю за персональные данные", callback_data="reason_no_privacy")],
+    [InlineKeyboardButton(text="Другое", callback_data="reason_no_other")],
+])
+
+
 def _validate_video_directory(directory_name: str, max_videos: int = 1) -> Path:
     """Validate video directory and return the video file path with comprehensive checks"""
     # Check if directory exists
@@ -44,11 +104,8 @@ def _validate_video_directory(directory_name: str, max_videos: int = 1) -> Path:
     if not video_dir.exists():
         raise FileNotFoundError(f"Directory '{directory_name}' not found")
     
-    # Find all video files
-    video_extensions = ['*.mp4', '*.mov', '*.avi', '*.mkv', '*.webm']
-    video_files = []
-    for ext in video_extensions:
-        video_files.extend(video_dir.glob(ext))
+    # Find all video files in a single directory scan
+    video_files = [path for path in video_dir.iterdir() if path.suffix.lower() in VIDEO_EXTS]
     
     # Check number of videos
     if len(video_files) != 1:
@@ -65,73 +122,96 @@ def _validate_video_directory(directory_name: str, max_videos: int = 1) -> Path:
     return video_path
 
 
+def _load_manager_video(application: Application) -> None:
+    """Validate the manager video once and keep its bytes in bot_data for every /start"""
+    try:
+        video_path = _validate_video_directory("manager_video", max_videos=1)
+        video_bytes = video_path.read_bytes()
+    except (FileNotFoundError, ValueError) as e:
+        application.bot_data["manager_video_error"] = str(e)
+        return
+
+    application.bot_data["manager_video_bytes"] = video_bytes
+    application.bot_data["manager_upload_lock"] = asyncio.Lock()
+    application.bot_data["manager_video_name"] = video_path.name
+    # Identifies the video a cached file_id belongs to, so replacing the video invalidates it
+    application.bot_data["manager_video_signature"] = f"{video_path.name}:{len(video_bytes)}"
+
+    # Reuse the Telegram file_id from a previous run if it was uploaded for the same video
+    try:
+        signature, file_id = Path(MANAGER_FILE_ID_FILE).read_text(encoding="utf-8").split("\n")[:2]
+        if signature == application.bot_data["manager_video_signature"] and file_id:
+            application.bot_data["manager_file_id"] = file_id
+    except (OSError, ValueError):
+        pass
+
+
+async def _send_manager_video(context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> None:
+    """Send the manager video, reusing Telegram's file_id instead of re-uploading after the first send"""
+    file_id = context.bot_data.get("manager_file_id")
+    if file_id:
+        try:
+            await context.bot.send_video(chat_id=chat_id, video=file_id, caption="Держи!")
+            return
+        except BadRequest:
+            # Cached file_id is no longer accepted, upload the file again
+            if context.bot_data.get("manager_file_id") == file_id:
+                context.bot_data.pop("manager_file_id", None)
+
+    # /start runs concurrently, so let only one chat upload the video while the others wait for its file_id
+    async with context.bot_data["manager_upload_lock"]:
+        file_id = context.bot_data.get("manager_file_id")
+        if file_id:
+            await context.bot.send_video(chat_id=chat_id, video=file_id, caption="Держи!")
+            return
+
+        message = await context.bot.send_video(
+            chat_id=chat_id, 
+            video=InputFile(BytesIO(context.bot_data["manager_video_bytes"]), filename=context.bot_data["manager_video_name"]), 
+            caption="Держи!"
+        )
+        sent_file = message.video or message.document
+        if sent_file:
+            context.bot_data["manager_file_id"] = sent_file.file_id
+            try:
+                Path(MANAGER_FILE_ID_FILE).write_text(
+                    f"{context.bot_data['manager_video_signature']}\n{sent_file.file_id}", encoding="utf-8"
+                )
+            except OSError:
+                pass
+
+
+async def _reply(update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, reply_markup=None) -> None:
+    """Send a message to the chat the update came from, whether it is a message or a callback query"""
+    chat_id = update.effective_chat.id if update.effective_chat else update.effective_user.id
+    await context.bot.send_message(chat_id=chat_id, text=text, reply_markup=reply_markup)
+
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Start command handler - sends intro text and manager video"""
-    # Collect user data silently
-    await collect_user_silently(update, context)
-    
-    # Check if this is a repeat start (user already has data in context)
+    # Collect user data silently on first contact only; a repeat start already has it in context
     if context.user_data.get("collected_user"):
         log_start_triggered_again(update, context)
     else:
+        await collect_user_silently(update, context)
         log_start(update, context)
     
-    await update.message.reply_text(INTRO_TEXT)
-    await asyncio.sleep(1)
-    # Get manager video path (with validation)
-    try:
-        manager_video_path = _validate_video_directory("manager_video", max_videos=1)  
+    await _reply(update, context, INTRO_TEXT)
+    # Manager video is validated and read once at startup (see _load_manager_video)
+    if "manager_video_bytes" in context.bot_data:
         try:
-            # Send video from local file
-            with open(manager_video_path, 'rb') as video_file:
-                await context.bot.send_video(
-                    chat_id=update.message.from_user.id, 
-                    video=video_file, 
-                    caption="Держи!"
-                )
+            await _send_manager_video(context, update.effective_chat.id)
             
             # Log that user got video
             log_got_video(update, context)
-            
-            # Wait a bit after sending video
-            await asyncio.sleep(2)
         except Exception as e:
             error_msg = f"Упс. Не могу отправить видео от менеджера. Ошибка: {str(e)}. Уже пошли чинить."
-            # Handle both message and callback query contexts
-            if update.message:
-                await context.bot.send_message(
-                    chat_id=update.message.from_user.id, 
-                    text=error_msg
-                )
-            elif update.callback_query and update.callback_query.message:
-                await context.bot.send_message(
-                    chat_id=update.callback_query.from_user.id, 
-                    text=error_msg
-                )
-            else:
-                # Fallback: send message to user directly
-                user_id = update.effective_user.id if update.effective_user else None
-                if user_id:
-                    await context.bot.send_message(chat_id=user_id, text=error_msg)
-    except (FileNotFoundError, ValueError) as e:
-        error_msg = f"Ошибка видео от менеджера: {str(e)}"
-        # Handle both message and callback query contexts
-        if update.message:
-            await context.bot.send_message(
-                chat_id=update.message.from_user.id, 
-                text=error_msg
-            )
-        elif update.callback_query and update.callback_query.message:
-            await context.bot.send_message(
-                chat_id=update.callback_query.from_user.id, 
-                text=error_msg
-            )
-        else:
-            # Fallback: send message to user directly
-            user_id = update.effective_user.id if update.effective_user else None
-            if user_id:
-                await context.bot.send_message(chat_id=user_id, text=error_msg)
-    await asyncio.sleep(3)
+            await _reply(update, context, error_msg)
+    else:
+        error_msg = f"Ошибка видео от менеджера: {context.bot_data.get('manager_video_error')}"
+        await _reply(update, context, error_msg)
+    if SLOW_MODE:
+        await asyncio.sleep(0.5)
     await ask_about_watched_video(update, context)
 
 
@@ -140,47 +220,16 @@ async def ask_about_watched_video(update: Update, context: ContextTypes.DEFAULT_
     # Log that we're asking about watched video
     log_asked_about_watched_video(update, context)
     
-    keyboard = [
-        [InlineKeyboardButton(text="Да", callback_data="video_yes")],
-        [InlineKeyboardButton(text="Нет", callback_data="video_no")],
-        [InlineKeyboardButton(text="Не вижу видео", callback_data="video_not_seen")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    # Handle both message and callback query contexts
-    if update.message:
-        await update.message.reply_text("Тебе понравилось видео?", reply_markup=reply_markup)
-    elif update.callback_query and update.callback_query.message:
-        await update.callback_query.message.reply_text("Тебе понравилось видео?", reply_markup=reply_markup)
-    else:
-        # Fallback: send message to user directly
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id:
-            await context.bot.send_message(chat_id=user_id, text="Тебе понравилось видео?", reply_markup=reply_markup)
+    await _reply(update, context, "Тебе понравилось видео?", reply_markup=WATCHED_VIDEO_KB)
 
 
-async def ask_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Ask user if they want to record a video"""
+async def ask_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE, prefix: str = "") -> None:
+    """Ask user if they want to record a video, optionally after an acknowledgement sent in the same message"""
     # Log that we're asking to shoot video
     log_asked_to_shoot_video(update, context)
     
-    keyboard = [
-        [InlineKeyboardButton(text="Кончено, Да", callback_data="yes")],
-        [InlineKeyboardButton(text="Возможно, надо подумать", callback_data="maybe")],
-        [InlineKeyboardButton(text="Нет, не хочу", callback_data="no")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    # Handle both message and callback query contexts
-    if update.message:
-        await update.message.reply_text(QUESTION_TEXT, reply_markup=reply_markup)
-    elif update.callback_query and update.callback_query.message:
-        await update.callback_query.message.reply_text(QUESTION_TEXT, reply_markup=reply_markup)
-    else:
-        # Fallback: send message to user directly
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id:
-            await context.bot.send_message(chat_id=user_id, text=QUESTION_TEXT, reply_markup=reply_markup)
+    text = f"{prefix}\n\n{QUESTION_TEXT}" if prefix else QUESTION_TEXT
+    await _reply(update, context, text, reply_markup=SHOOT_VIDEO_KB)
 
 
 async def instructions_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -188,16 +237,7 @@ async def instructions_to_shoot_video(update: Update, context: ContextTypes.DEFA
     # Log that user got instructions
     log_got_instructions(update, context)
     
-    # Handle both message and callback query contexts
-    if update.message:
-        await update.message.reply_text(INSTRUCTIONS_TO_SHOOT_VIDEO_TEXT)
-    elif update.callback_query and update.callback_query.message:
-        await update.callback_query.message.reply_text(INSTRUCTIONS_TO_SHOOT_VIDEO_TEXT)
-    else:
-        # Fallback: send message to user directly
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id:
-            await context.bot.send_message(chat_id=user_id, text=INSTRUCTIONS_TO_SHOOT_VIDEO_TEXT)
+    await _reply(update, context, INSTRUCTIONS_TO_SHOOT_VIDEO_TEXT)
 
 
 async def ask_to_confirm_sending(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -205,22 +245,7 @@ async def ask_to_confirm_sending(update: Update, context: ContextTypes.DEFAULT_T
     # Log that we're asking to confirm sending
     log_asked_to_confirm_sending(update, context)
     
-    keyboard = [
-        [InlineKeyboardButton(text="Да", callback_data="confirm_yes_privacy")],
-        [InlineKeyboardButton(text="Нет", callback_data="confirm_no")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    # Handle both message and callback query contexts
-    if update.message:
-        await update.message.reply_text(CONFIRM_TEXT, reply_markup=reply_markup)
-    elif update.callback_query and update.callback_query.message:
-        await update.callback_query.message.reply_text(CONFIRM_TEXT, reply_markup=reply_markup)
-    else:
-        # Fallback: send message to user directly
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id:
-            await context.bot.send_message(chat_id=user_id, text=CONFIRM_TEXT, reply_markup=reply_markup)
+    await _reply(update, context, CONFIRM_TEXT, reply_markup=CONFIRM_SEND_KB)
 
 
 async def privacy_policy_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -228,22 +253,7 @@ async def privacy_policy_confirmation(update: Update, context: ContextTypes.DEFA
     # Log that we're asking to confirm privacy
     log_asked_to_confirm_privacy(update, context)
     
-    keyboard = [
-        [InlineKeyboardButton(text="Отправить", callback_data="privacy_confirm_yes")],
-        [InlineKeyboardButton(text="Не отправлять", callback_data="privacy_confirm_no")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    # Handle both message and callback query contexts
-    if update.message:
-        await update.message.reply_text(PRIVACY_TEXT, reply_markup=reply_markup)
-    elif update.callback_query and update.callback_query.message:
-        await update.callback_query.message.reply_text(PRIVACY_TEXT, reply_markup=reply_markup)
-    else:
-        # Fallback: send message to user directly
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id:
-            await context.bot.send_message(chat_id=user_id, text=PRIVACY_TEXT, reply_markup=reply_markup)
+    await _reply(update, context, PRIVACY_TEXT, reply_markup=PRIVACY_KB)
 
 
 async def feedback_privacy_confirmation(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -251,7 +261,7 @@ async def feedback_privacy_confirmation(update: Update, context: ContextTypes.DE
     query = update.callback_query
     await query.answer()
     
-    print(f"DEBUG: feedback_privacy_confirmation called with query.data={query.data}")
+    logger.debug("feedback_privacy_confirmation called with query.data=%s", query.data)
     
     # Log user's answer about privacy confirmation
     answer = "yes" if query.data == "privacy_confirm_yes" else "no"
@@ -259,11 +269,11 @@ async def feedback_privacy_confirmation(update: Update, context: ContextTypes.DE
     
     if query.data == "privacy_confirm_yes":
         # User agreed to privacy policy, proceed with video download
-        print("DEBUG: User confirmed privacy policy, calling handle_video_confirmation")
+        logger.debug("User confirmed privacy policy, calling handle_video_confirmation")
         await handle_video_confirmation(update, context, bot_type="applicant")
     elif query.data == "privacy_confirm_no":
         # User declined privacy policy, ask why they're hesitant
-        print("DEBUG: User declined privacy policy, asking why hesitant")
+        logger.debug("User declined privacy policy, asking why hesitant")
         await ask_why_hesitant_or_reject_to_shoot_video(update, context)
 
 
@@ -276,14 +286,9 @@ async def feedback_to_confirm_sending(update: Update, context: ContextTypes.DEFA
     log_answered_confirm_sending(update, context, query.data)
     
     # Clear pending data since user declined
-    context.user_data.pop("pending_file_id", None)
-    context.user_data.pop("pending_kind", None)
-    context.user_data.pop("pending_duration", None)
+    context.user_data.pop("pending", None)
     
-    if query.message:
-        await query.message.reply_text("Хорошо, запиши новое видео и пришли его сюда, пожалуйста.")
-    else:
-        await context.bot.send_message(chat_id=query.from_user.id, text="Хорошо, запиши новое видео и пришли его сюда, пожалуйста.")
+    await _reply(update, context, "Хорошо, запиши новое видео и пришли его сюда, пожалуйста.")
 
 
 async def feedback_about_watched_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -292,12 +297,7 @@ async def feedback_about_watched_video(update: Update, context: ContextTypes.DEF
     await query.answer()
     
     # Log user's answer about watched video
-    answer_map = {
-        "video_yes": "yes",
-        "video_no": "no", 
-        "video_not_seen": "not_seen"
-    }
-    log_answered_about_watched_video(update, context, answer_map.get(query.data, query.data))
+    log_answered_about_watched_video(update, context, _ANSWER_MAP.get(query.data, query.data))
     
     # Remove inline keyboard if present
     try:
@@ -305,33 +305,9 @@ async def feedback_about_watched_video(update: Update, context: ContextTypes.DEF
     except Exception:
         pass
     
-    if query.data == "video_yes":
-        # User liked the video
-        if query.message:
-            await query.message.reply_text("Отлично!⚡")
-            await asyncio.sleep(1)
-        else:
-            await context.bot.send_message(chat_id=query.from_user.id, text="Отлично!⚡")
-            await asyncio.sleep(1)
-    elif query.data == "video_no":
-        # User didn't like the video
-        if query.message:
-            await query.message.reply_text("Понятно. Спасибо за честность!😊")
-            await asyncio.sleep(1)
-        else:
-            await context.bot.send_message(chat_id=query.from_user.id, text="Понятно. Спасибо за честность!😊")
-            await asyncio.sleep(1)
-    elif query.data == "video_not_seen":
-        # User didn't see the video
-        if query.message:
-            await query.message.reply_text("Извиняюсь за технические проблемы. Пошел ремонтироваться 😊")
-            await asyncio.sleep(1)
-        else:
-            await context.bot.send_message(chat_id=query.from_user.id, text="Извиняюсь за технические проблемы. Пошел ремонтироваться 😊")
-            await asyncio.sleep(1)
-    
-    # All users proceed to ask_to_shoot_video regardless of their answer
-    await ask_to_shoot_video(update, context)
+    # All users proceed to ask_to_shoot_video regardless of their answer; the acknowledgement
+    # goes out in the same message to spend a single API call
+    await ask_to_shoot_video(update, context, prefix=_ACK_TEXTS[query.data])
 
 
 async def ask_why_hesitant_or_reject_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -339,25 +315,7 @@ async def ask_why_hesitant_or_reject_to_shoot_video(update: Update, context: Con
     # Log that we're asking why hesitant or reject
     log_asked_why_hesitant_or_reject(update, context)
     
-    keyboard = [
-        [InlineKeyboardButton(text="Не хочу устраиваться в эту компанию", callback_data="reason_no_company")],
-        [InlineKeyboardButton(text="Неловко записывать видео", callback_data="reason_no_awkward")],
-        [InlineKeyboardButton(text="Не знаю как или что записать", callback_data="reason_no_dont_know")],
-        [InlineKeyboardButton(text="Переживаю за персональные данные", callback_data="reason_no_privacy")],
-        [InlineKeyboardButton(text="Другое", callback_data="reason_no_other")],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    # Handle both message and callback query contexts
-    if update.message:
-        await update.message.reply_text("Пожалуйста, расскажи почему.😊", reply_markup=reply_markup)
-    elif update.callback_query and update.callback_query.message:
-        await update.callback_query.message.reply_text("Пожалуйста, расскажи почему.😊", reply_markup=reply_markup)
-    else:
-        # Fallback: send message to user directly
-        user_id = update.effective_user.id if update.effective_user else None
-        if user_id:
-            await context.bot.send_message(chat_id=user_id, text="Пожалуйста, расскажи почему.", reply_markup=reply_markup)
+    await _reply(update, context, "Пожалуйста, расскажи почему.😊", reply_markup=HESITANT_KB)
 
 
 async def feedback_why_hesitant_or_reject_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -366,14 +324,7 @@ async def feedback_why_hesitant_or_reject_to_shoot_video(update: Update, context
     await query.answer()
     
     # Log user's reason for being hesitant or rejecting
-    reason_map = {
-        "reason_no_company": "no_company",
-        "reason_no_awkward": "awkward", 
-        "reason_no_dont_know": "dont_know",
-        "reason_no_privacy": "privacy",
-        "reason_no_other": "other"
-    }
-    log_answered_why_hesitant_or_reject(update, context, reason_map.get(query.data, query.data))
+    log_answered_why_hesitant_or_reject(update, context, _REASON_MAP.get(query.data, query.data))
     
     # Remove inline keyboard if present
     try:
@@ -382,10 +333,7 @@ async def feedback_why_hesitant_or_reject_to_shoot_video(update: Update, context
         pass
     
     # No matter what the reason is, just say "Спасибо!"
-    if query.message:
-        await query.message.reply_text("Спасибо за обратную связь!\nМы это учтем.\nХорошего дня! 😊")
-    else:
-        await context.bot.send_message(chat_id=query.from_user.id, text="Спасибо за обратную связь!\nМы это учтем.\nХорошего дня! 😊")
+    await _reply(update, context, "Спасибо за обратную связь!\nМы это учтем.\nХорошего дня! 😊")
 
 
 async def feedback_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -409,16 +357,39 @@ async def feedback_to_shoot_video(update: Update, context: ContextTypes.DEFAULT_
         await ask_why_hesitant_or_reject_to_shoot_video(update, context)
 
 
+# Exact callback_data -> handler, so one dict lookup replaces trying each handler's regex in turn
+_CB_ROUTES = {
+    "video_yes": feedback_about_watched_video,
+    "video_no": feedback_about_watched_video,
+    "video_not_seen": feedback_about_watched_video,
+    "yes": feedback_to_shoot_video,
+    "maybe": feedback_to_shoot_video,
+    "no": feedback_to_shoot_video,
+    "reason_no_company": feedback_why_hesitant_or_reject_to_shoot_video,
+    "reason_no_awkward": feedback_why_hesitant_or_reject_to_shoot_video,
+    "reason_no_dont_know": feedback_why_hesitant_or_reject_to_shoot_video,
+    "reason_no_privacy": feedback_why_hesitant_or_reject_to_shoot_video,
+    "reason_no_other": feedback_why_hesitant_or_reject_to_shoot_video,
+    "confirm_yes_privacy": privacy_policy_confirmation,
+    "confirm_no": feedback_to_confirm_sending,
+    "privacy_confirm_yes": feedback_privacy_confirmation,
+    "privacy_confirm_no": feedback_privacy_confirmation,
+}
+
+
+async def dispatch_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Route an inline button press to its handler by callback_data"""
+    handler = _CB_ROUTES.get(update.callback_query.data)
+    if handler:
+        await handler(update, context)
+
+
 def create_applicant_application(token: str) -> Application:
     application = Application.builder().token(token).build()
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CallbackQueryHandler(feedback_about_watched_video, pattern="^(video_yes|video_no|video_not_seen)$"))
-    application.add_handler(CallbackQueryHandler(feedback_to_shoot_video, pattern="^(yes|maybe|no)$"))
-    application.add_handler(CallbackQueryHandler(feedback_why_hesitant_or_reject_to_shoot_video, pattern="^(reason_no_company|reason_no_awkward|reason_no_dont_know|reason_no_privacy|reason_no_other)$"))
-    application.add_handler(MessageHandler(filters.ALL & (filters.VIDEO | filters.VIDEO_NOTE | filters.Document.VIDEO), lambda update, context: handle_video(update, context, ask_to_confirm_sending)))
-    application.add_handler(CallbackQueryHandler(privacy_policy_confirmation, pattern="^confirm_yes_privacy$"))
-    application.add_handler(CallbackQueryHandler(feedback_to_confirm_sending, pattern="^confirm_no$"))
-    application.add_handler(CallbackQueryHandler(feedback_privacy_confirmation, pattern="^(privacy_confirm_yes|privacy_confirm_no)$"))
+    _load_manager_video(application)
+    application.add_handler(CommandHandler("start", start, block=False))
+    application.add_handler(CallbackQueryHandler(dispatch_callback))
+    application.add_handler(MessageHandler(filters.VIDEO | filters.VIDEO_NOTE | filters.Document.VIDEO, partial(handle_video, ask_to_confirm_sending_func=ask_to_confirm_sending), block=False))
     return application
 
 
@@ -1,102 +1,92 @@
 #!/usr/bin/env python3
 """
-Helper script to process user_actions.json and organize data by user_id.
+Helper script to process the user_actions/ directory (one JSONL file per user) and organize data by user_id.
 Sorts actions by timestamp and includes answers/reasons if available.
 """
 
+import asyncio
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Any, Optional
 
+from action_types import decode_action
+from json_utils import dumps_pretty, iter_json_records
 
-def read_user_actions(file_path: str) -> List[Dict[str, Any]]:
+
+def read_user_actions(file_path: str, user_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
     """
-    Read user_actions.json file and return the data as a list of dictionaries.
+    Stream user actions one dictionary at a time.
+    Accepts either the per-user actions directory or a single newline-delimited JSON file;
+    legacy files holding a single JSON list are also accepted.
     
     Args:
-        file_path (str): Path to the JSON file
+        file_path (str): Path to the actions directory or JSONL file
+        user_id (Optional[int]): Owner of a per-user file, used for records that omit user_id
         
-    Returns:
-        List[Dict[str, Any]]: List of action dictionaries
+    Yields:
+        Dict[str, Any]: Action dictionaries
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        return data
+        if os.path.isdir(file_path):
+            for name in sorted(os.listdir(file_path)):
+                if name.endswith('.jsonl'):
+                    stem = name[:-len('.jsonl')]
+                    file_user_id = int(stem) if stem.isdigit() else None
+                    yield from read_user_actions(os.path.join(file_path, name), file_user_id)
+            return
+
+        for record in iter_json_records(file_path):
+            yield decode_action(record, user_id)
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
-        return []
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON format in '{file_path}': {e}")
-        return []
     except Exception as e:
         print(f"Error reading file '{file_path}': {e}")
-        return []
 
 
-def parse_timestamp(timestamp_str: str) -> datetime:
-    """
-    Parse timestamp string to datetime object for sorting.
-    
-    Args:
-        timestamp_str (str): ISO format timestamp string
-        
-    Returns:
-        datetime: Parsed datetime object
-    """
-    try:
-        # Handle ISO format with timezone
-        return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-    except ValueError:
-        # Fallback for different timestamp formats
-        try:
-            return datetime.fromisoformat(timestamp_str)
-        except ValueError:
-            print(f"Warning: Could not parse timestamp: {timestamp_str}")
-            return datetime.min
-
-
-def organize_actions_by_user(actions: List[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
+def organize_actions_by_user(actions: Iterable[Dict[str, Any]]) -> Dict[int, List[Dict[str, Any]]]:
     """
     Organize actions by user_id and sort by timestamp.
     
     Args:
-        actions (List[Dict[str, Any]]): List of action dictionaries
+        actions (Iterable[Dict[str, Any]]): Action dictionaries, e.g. as streamed by read_user_actions
         
     Returns:
         Dict[int, List[Dict[str, Any]]]: Dictionary with user_id as key and sorted actions as values
     """
-    user_actions = {}
+    user_actions = defaultdict(list)
     
     for action in actions:
         user_id = action.get('user_id')
         if user_id is None:
             continue
             
-        # Create action entry with all relevant fields
+        # Normalize the UTC suffix so ISO timestamps sort correctly as plain strings
+        timestamp = action.get('timestamp') or ''
+        if timestamp.endswith('Z'):
+            timestamp = timestamp[:-1] + '+00:00'
+        
+        # Create action entry, adding answer/reason only when present to keep the dictionary clean
         action_entry = {
             'action_type': action.get('action_type', ''),
-            'timestamp': action.get('timestamp', ''),
-            'answer': action.get('answer'),
-            'reason': action.get('reason')
+            'timestamp': timestamp
         }
+        if (answer := action.get('answer')) is not None:
+            action_entry['answer'] = answer
+        if (reason := action.get('reason')) is not None:
+            action_entry['reason'] = reason
         
-        # Remove None values to keep the dictionary clean
-        action_entry = {k: v for k, v in action_entry.items() if v is not None}
-        
-        # Add to user's actions
-        if user_id not in user_actions:
-            user_actions[user_id] = []
         user_actions[user_id].append(action_entry)
     
     # Sort actions by timestamp for each user
-    for user_id in user_actions:
-        user_actions[user_id].sort(
-            key=lambda x: parse_timestamp(x.get('timestamp', ''))
-        )
+    sort_key = itemgetter('timestamp')
+    for actions in user_actions.values():
+        actions.sort(key=sort_key)
     
-    return user_actions
+    return dict(user_actions)
 
 
 def save_organized_data(data: Dict[int, List[Dict[str, Any]]], output_file: str) -> bool:
@@ -111,14 +101,28 @@ def save_organized_data(data: Dict[int, List[Dict[str, Any]]], output_file: str)
         bool: True if successful, False otherwise
     """
     try:
-        with open(output_file, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=2, ensure_ascii=False)
+        with open(output_file, 'wb') as file:
+            file.write(dumps_pretty(data))
         return True
     except Exception as e:
         print(f"Error saving data to '{output_file}': {e}")
         return False
 
 
+async def save_organized_data_async(data: Dict[int, List[Dict[str, Any]]], output_file: str) -> bool:
+    """
+    Save organized data from async code without blocking the event loop.
+    
+    Args:
+        data (Dict[int, List[Dict[str, Any]]]): Organized user actions data
+        output_file (str): Path to the output JSON file
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    return await asyncio.to_thread(save_organized_data, data, output_file)
+
+
 def print_summary(data: Dict[int, List[Dict[str, Any]]]) -> None:
     """
     Print a summary of the organized data.
@@ -148,27 +152,26 @@ def main():
     Main function to execute the user actions organization.
     """
     # Define file paths
-    input_file = "user_actions.json"
+    input_file = "user_actions"
+    if not os.path.exists(input_file) and os.path.exists("user_actions.json"):
+        # Bot has not migrated the legacy single-file log yet
+        input_file = "user_actions.json"
     output_file = "organized_user_actions.json"
     
     # Check if input file exists
     if not os.path.exists(input_file):
-        print(f"Error: Input file '{input_file}' not found in current directory.")
+        print(f"Error: Input '{input_file}' not found in current directory.")
         return
     
-    # Read user actions data
-    print(f"Reading data from '{input_file}'...")
-    actions = read_user_actions(input_file)
+    # Stream user actions straight into the per-user grouping
+    print(f"Reading data from '{input_file}', organizing actions by user_id and sorting by timestamp...")
+    organized_data = organize_actions_by_user(read_user_actions(input_file))
     
-    if not actions:
+    if not organized_data:
         print("No data found or error reading file.")
         return
     
-    print(f"Found {len(actions)} actions")
-    
-    # Organize actions by user
-    print("Organizing actions by user_id and sorting by timestamp...")
-    organized_data = organize_actions_by_user(actions)
+    print(f"Found {sum(len(actions) for actions in organized_data.values())} actions")
     
     # Save organized data
     print(f"Saving organized data to '{output_file}'...")
@@ -181,7 +184,7 @@ def main():
         
         # Show sample of organized data
         if organized_data:
-            sample_user = list(organized_data.keys())[0]
+            sample_user = next(iter(organized_data))
             print(f"\nSample data for user {sample_user}:")
             sample_actions = organized_data[sample_user][:3]  # Show first 3 actions
             for i, action in enumerate(sample_actions, 1):
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Helper script to convert applicant_users.json to CSV format.
+Helper script to convert applicant_users.jsonl to CSV format.
 Creates a CSV file with columns: user_id, username, first_name, last_name, language_code
 """
 
@@ -9,21 +9,22 @@ import csv
 import os
 from typing import List, Dict, Any
 
+from json_utils import iter_json_records
+
 
 def read_json_file(file_path: str) -> List[Dict[str, Any]]:
     """
-    Read JSON file and return the data as a list of dictionaries.
+    Read the users file and return the data as a list of dictionaries.
+    Accepts newline-delimited JSON as well as legacy files holding a single JSON list.
     
     Args:
-        file_path (str): Path to the JSON file
+        file_path (str): Path to the JSONL (or legacy JSON) file
         
     Returns:
         List[Dict[str, Any]]: List of user dictionaries
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        return data
+        return list(iter_json_records(file_path))
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         return []
@@ -54,19 +55,16 @@ def convert_to_csv(data: List[Dict[str, Any]], output_file: str) -> bool:
         with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
             # Define the fieldnames in the specified order
             fieldnames = ['user_id', 'username', 'first_name', 'last_name', 'language_code']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.writer(csvfile)
             
             # Write the header
-            writer.writeheader()
+            writer.writerow(fieldnames)
             
-            # Write the data rows
-            for user in data:
-                # Handle None values by converting them to empty strings
-                row = {}
-                for field in fieldnames:
-                    value = user.get(field)
-                    row[field] = '' if value is None else str(value)
-                writer.writerow(row)
+            # Write the data rows, converting None values to empty strings
+            writer.writerows(
+                ['' if (value := user.get(field)) is None else str(value) for field in fieldnames]
+                for user in data
+            )
         
         print(f"Successfully converted {len(data)} records to '{output_file}'")
         return True
@@ -81,7 +79,10 @@ def main():
     Main function to execute the JSON to CSV conversion.
     """
     # Define file paths
-    json_file = "applicant_users.json"
+    json_file = "applicant_users.jsonl"
+    if not os.path.exists(json_file) and os.path.exists("applicant_users.json"):
+        # Bot has not migrated the legacy file yet
+        json_file = "applicant_users.json"
     csv_file = "applicant_users.csv"
     
     # Check if JSON file exists
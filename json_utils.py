@@ -0,0 +1,64 @@
+"""
+Fast JSON encoding/decoding backed by orjson, with a stdlib json fallback
+"""
+import json
+import os
+from typing import Iterator
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def dumps(obj) -> bytes:
+        """Serialize obj to compact UTF-8 encoded JSON bytes"""
+        return orjson.dumps(obj)
+
+    def dumps_pretty(obj) -> bytes:
+        """Serialize obj to UTF-8 encoded JSON bytes indented by two spaces"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+else:
+    def dumps(obj) -> bytes:
+        """Serialize obj to compact UTF-8 encoded JSON bytes"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps_pretty(obj) -> bytes:
+        """Serialize obj to UTF-8 encoded JSON bytes indented by two spaces"""
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+    loads = json.loads
+
+
+def terminate_last_line(fd: int) -> None:
+    """Append a newline if the file ends in a partial line (e.g. an interrupted write),
+    so the next appended record starts on its own line. fd must be opened for reading too."""
+    try:
+        if os.lseek(fd, -1, os.SEEK_END) >= 0 and os.read(fd, 1) != b"\n":
+            os.write(fd, b"\n")
+    except OSError:
+        # Empty file: nothing to terminate
+        pass
+
+
+def iter_json_records(path: str) -> Iterator[dict]:
+    """Yield the JSON objects of a JSONL file, skipping blank or corrupted lines (e.g. an interrupted write).
+    Legacy files holding a single JSON list are also accepted."""
+    with open(path, "rb") as f:
+        first = True
+        for line in f:
+            if first and line.strip():
+                first = False
+                if line.lstrip().startswith(b"["):
+                    records = loads(line + f.read())
+                    yield from (record for record in records if isinstance(record, dict))
+                    return
+            try:
+                record = loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                yield record
@@ -4,6 +4,12 @@ from pathlib import Path
 
 from applicant_bot import create_applicant_application
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is unavailable on Windows, fall back to the default asyncio loop
+    uvloop = None
+
 
 def ensure_directories() -> None:
     """Ensure required directories exist"""
@@ -35,7 +41,10 @@ def main():
     # Ensure required directories exist
     ensure_directories()
     # Run the applicant bot (validation happens inside the bot)
-    asyncio.run(run_applicant_bot())
+    if uvloop is not None:
+        uvloop.run(run_applicant_bot())
+    else:
+        asyncio.run(run_applicant_bot())
 
 
 if __name__ == "__main__":
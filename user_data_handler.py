@@ -1,70 +1,200 @@
 """
 User data collection and storage functionality
 """
-import json
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Dict, List, Optional, Set
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from json_utils import dumps, iter_json_records, terminate_last_line
 
-def _append_user_event(entry: dict, filename: str = "applicant_users.json") -> None:
-    """Append user event to JSON file, only if user is new"""
-    out_path = Path(filename)
+
+USERS_FILE = "applicant_users.jsonl"
+LEGACY_USERS_FILE = "applicant_users.json"
+
+# user_ids already stored, per users file; loaded from disk on first use
+_known_user_ids: Dict[str, Set[int]] = {}
+_users_lock = threading.Lock()
+# Single worker keeps users file writes off the event loop and in order
+_io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-data-io")
+
+
+def _migrate_legacy_users_file(filename: str = USERS_FILE, legacy_filename: str = LEGACY_USERS_FILE) -> None:
+    """Convert a legacy users file holding one JSON list into JSONL (one-shot)"""
+    legacy_path = Path(legacy_filename)
+    if Path(filename).exists() or not legacy_path.is_file():
+        return
     try:
-        if out_path.exists():
-            try:
-                existing = json.loads(out_path.read_text(encoding="utf-8"))
-                if not isinstance(existing, list):
-                    existing = []
-            except Exception:
-                existing = []
-        else:
-            existing = []
-
-        # Check if user already exists
-        user_id = entry.get("user_id")
-        if user_id:
-            user_exists = any(user.get("user_id") == user_id for user in existing)
-            if not user_exists:
-                # Only add essential fields for new users
-                clean_entry = {
-                    "user_id": entry.get("user_id"),
-                    "username": entry.get("username"),
-                    "first_name": entry.get("first_name"),
-                    "last_name": entry.get("last_name"),
-                    "language_code": entry.get("language_code")
-                }
-                existing.append(clean_entry)
-                out_path.write_text(json.dumps(existing, ensure_ascii=False, indent=2), encoding="utf-8")
+        existing = list(iter_json_records(legacy_filename))
     except Exception:
-        # Fail silently to avoid breaking bot flow
+        return
+    with open(filename, "ab") as f:
+        f.write(b"".join(dumps(user) + b"\n" for user in existing))
+    legacy_path.replace(legacy_path.with_name(legacy_path.name + ".migrated"))
+
+
+def _load_known_user_ids(filename: str = USERS_FILE) -> Set[int]:
+    """Get the set of stored user_ids, streaming the users file once on first call"""
+    known = _known_user_ids.get(filename)
+    if known is not None:
+        return known
+
+    if filename == USERS_FILE:
+        _migrate_legacy_users_file(filename)
+    known = set()
+    try:
+        known.update(record["user_id"] for record in iter_json_records(filename) if record.get("user_id"))
+    except FileNotFoundError:
         pass
+    _known_user_ids[filename] = known
+    return known
+
 
+# Append handles of the users files, opened once and reused for every write
+_users_files: Dict[str, BinaryIO] = {}
 
-async def collect_user_silently(update: Update, context: ContextTypes.DEFAULT_TYPE, filename: str = "applicant_users.json") -> None:
+
+def _get_users_file(filename: str = USERS_FILE) -> BinaryIO:
+    """Get the cached append-mode handle of a users file, opening it on first use"""
+    f = _users_files.get(filename)
+    if f is None:
+        fd = os.open(filename, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        terminate_last_line(fd)
+        f = _users_files[filename] = os.fdopen(fd, "ab", buffering=1 << 16)
+    return f
+
+
+def _close_users_files(filename: Optional[str] = None) -> None:
+    """Close the cached handle of one users file, or of all of them"""
+    for name in [filename] if filename else list(_users_files):
+        f = _users_files.pop(name, None)
+        if f is not None:
+            try:
+                f.close()
+            except OSError:
+                pass
+
+
+atexit.register(_close_users_files)
+
+
+def _append_user_events(entries: List[dict], filename: str = USERS_FILE) -> None:
+    """Append the new users among entries (essential fields only) to the JSONL users file with one write and one fsync"""
+    try:
+        # Claim user_ids before writing so concurrent callers don't both append them
+        with _users_lock:
+            known = _load_known_user_ids(filename)
+            new_users = []
+            for entry in entries:
+                user_id = entry["user_id"]
+                if user_id and user_id not in known:
+                    known.add(user_id)
+                    new_users.append(entry)
+    except Exception:
+        return
+    if not new_users:
+        return
+
+    lines = b"".join(dumps(entry) + b"\n" for entry in new_users)
+    try:
+        with _users_lock:
+            f = _get_users_file(filename)
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception:
+        # Fail silently to avoid breaking bot flow; forget the claims so later events retry
+        with _users_lock:
+            known.difference_update(entry["user_id"] for entry in new_users)
+            _close_users_files(filename)
+
+
+def _append_user_event(entry: dict, filename: str = USERS_FILE) -> None:
+    """Append user event (essential fields only) to the JSONL users file, only if user is new"""
+    _append_user_events([entry], filename)
+
+
+_user_queue: Optional[asyncio.Queue] = None
+_user_writer_task: Optional[asyncio.Task] = None
+
+
+async def _user_writer_loop(queue: asyncio.Queue) -> None:
+    """Drain queued user events and append each batch from the I/O thread"""
+    loop = asyncio.get_running_loop()
+    # Batches taken off the queue but not yet confirmed written, per users file
+    in_flight: Dict[str, List[dict]] = {}
+    try:
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            for entry, filename in batch:
+                in_flight.setdefault(filename, []).append(entry)
+            while in_flight:
+                filename, entries = next(iter(in_flight.items()))
+                await loop.run_in_executor(_io_executor, _append_user_events, entries, filename)
+                del in_flight[filename]
+    except asyncio.CancelledError:
+        # Application is shutting down: persist the interrupted batch and whatever is still queued.
+        # Users the I/O thread already wrote are known by now, so they are not appended twice.
+        while not queue.empty():
+            entry, filename = queue.get_nowait()
+            in_flight.setdefault(filename, []).append(entry)
+        for filename, entries in in_flight.items():
+            _append_user_events(entries, filename)
+        raise
+
+
+def _enqueue_user_event(entry: dict, filename: str) -> None:
+    """Queue a user event for the background writer, starting it on first use"""
+    global _user_queue, _user_writer_task
+    if _user_writer_task is None or _user_writer_task.done() or _user_writer_task.get_loop() is not asyncio.get_running_loop():
+        _user_queue = asyncio.Queue()
+        _user_writer_task = asyncio.create_task(_user_writer_loop(_user_queue))
+    _user_queue.put_nowait((entry, filename))
+
+
+async def collect_user_silently(update: Update, context: ContextTypes.DEFAULT_TYPE, filename: str = USERS_FILE) -> None:
     """Collect user data silently and store it"""
     user = update.effective_user
+    known = _known_user_ids.get(filename)
+    # Already collected and stored on disk, nothing to do; if the write failed the id is
+    # not known, so fall through and let the writer retry
+    if "collected_user" in context.user_data and known is not None and user and user.id in known:
+        return
+
     chat = update.effective_chat
-    collected = {
+    # Only the essential fields are stored on disk
+    user_entry = {
         "user_id": user.id if user else None,
         "username": user.username if user else None,
         "first_name": user.first_name if user else None,
         "last_name": user.last_name if user else None,
         "language_code": getattr(user, "language_code", None),
+    }
+    collected = {
+        **user_entry,
         "chat_id": chat.id if chat else None,
         "chat_type": chat.type if chat else None,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
     context.user_data["collected_user"] = collected
-    _append_user_event(collected, filename)
+    # Known users (e.g. after a restart cleared user_data) need no trip to the writer
+    if known is not None and user_entry["user_id"] in known:
+        return
+    _enqueue_user_event(user_entry, filename)
 
 
 def collect_user_data(user_id: Optional[int] = None, username: Optional[str] = None, 
                      first_name: Optional[str] = None, last_name: Optional[str] = None,
-                     language_code: Optional[str] = None, filename: str = "applicant_users.json") -> None:
+                     language_code: Optional[str] = None, filename: str = USERS_FILE) -> None:
     """Collect user data manually and store it (only essential fields)"""
     collected = {
         "user_id": user_id,